@@ -0,0 +1,16 @@
+"""
+Environment configuration shared by the web app, email service and worker
+"""
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Load .env before anything reads the environment, so every module sees the
+# same values no matter which one is imported first.
+load_dotenv()
+
+
+@lru_cache(maxsize=None)
+def env(name, default=None):
+    """Return an environment variable, looked up once per process"""
+    return os.environ.get(name, default)
@@ -0,0 +1,274 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import threading
+import time
+
+from config import env
+
+SENDER_EMAIL = env("SENDER_EMAIL", "")
+SENDER_PASSWORD = env("SENDER_PASSWORD", "")
+
+# SMTP handshake + send takes seconds, so in long-lived processes (gunicorn,
+# run.py) deliveries run on a small pool and request handlers return as soon
+# as the message is queued. Serverless instances (Vercel sets VERCEL) are
+# frozen or recycled once the response is returned, which would strand
+# queued mail, so there every send completes before the request does.
+SEND_IN_BACKGROUND = not env("VERCEL")
+_EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="email")
+SEND_RETRIES = 3
+
+# Each sender thread keeps its own logged-in SMTP connection so the TLS
+# handshake and AUTH are paid once per connection rather than per message.
+# Connections are recycled after a fixed number of messages.
+_smtp_local = threading.local()
+MAX_MESSAGES_PER_CONNECTION = 100
+
+# Gmail accepts at most this many RCPT TO addresses per message
+BULK_RECIPIENT_LIMIT = 100
+
+def _close_connection():
+    """Drop this thread's SMTP connection so the next send reconnects"""
+    server = getattr(_smtp_local, 'server', None)
+    _smtp_local.server = None
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+def _get_connection():
+    """Return this thread's SMTP connection, reconnecting if it is stale"""
+    import smtplib
+    
+    server = getattr(_smtp_local, 'server', None)
+    if server is not None and _smtp_local.count >= MAX_MESSAGES_PER_CONNECTION:
+        _close_connection()
+        server = None
+    
+    if server is not None:
+        try:
+            server.noop()
+        except (smtplib.SMTPException, OSError):
+            _close_connection()
+            server = None
+    
+    if server is None:
+        server = smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=30)
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        _smtp_local.server = server
+        _smtp_local.count = 0
+    return server
+
+def _body_part(body, subtype):
+    """Build a charset-encoded text/<subtype> body part"""
+    from email.message import MIMEPart
+    part = MIMEPart()
+    part.set_content(body, subtype=subtype)
+    return part
+
+def _build_message(to_email, subject, html_body, text_body=None):
+    """Assemble a multipart/alternative EmailMessage"""
+    from email.message import EmailMessage
+    
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = to_email
+    msg['MIME-Version'] = '1.0'
+    msg.make_alternative()
+    
+    # Add text version if provided
+    if text_body:
+        msg.attach(_body_part(text_body, 'plain'))
+    
+    # Add HTML version
+    msg.attach(_body_part(html_body, 'html'))
+    return msg
+
+def _is_transient(error):
+    """
+    Whether a failed send may be retried without risking a duplicate: only
+    4xx replies, which mean the server did not accept the message
+    """
+    import smtplib
+    
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+def _deliver(send, success_message):
+    """
+    Run send(server) over this thread's SMTP connection, retrying with
+    exponential backoff when the connection could not be set up or the
+    server answered 4xx. Permanent (5xx) rejections and failures once the
+    message may already have been accepted are not retried.
+    """
+    # Imported here so cold starts that never send mail don't load it
+    import smtplib
+    
+    for attempt in range(SEND_RETRIES):
+        try:
+            server = _get_connection()
+        except smtplib.SMTPAuthenticationError as e:
+            # Bad credentials will not fix themselves on retry
+            _close_connection()
+            return False, f"Failed to send email: {e}"
+        except (smtplib.SMTPException, OSError) as e:
+            # Nothing was sent yet, so reconnecting is safe
+            _close_connection()
+            error = e
+        else:
+            try:
+                send(server)
+                _smtp_local.count += 1
+                return True, success_message
+            except Exception as e:
+                _close_connection()
+                if not _is_transient(e):
+                    return False, f"Failed to send email: {e}"
+                error = e
+        if attempt < SEND_RETRIES - 1:
+            time.sleep(2 ** attempt)
+    
+    return False, f"Failed to send email: {error}"
+
+def _send_email_sync(to_email, subject, html_body, text_body=None):
+    """
+    Send an email with HTML content, retrying transient SMTP failures
+    """
+    msg = _build_message(to_email, subject, html_body, text_body)
+    return _deliver(lambda server: server.send_message(msg), "Email sent successfully")
+
+def _send_bulk_email_sync(to_emails, subject, html_body, text_body=None):
+    """
+    Send one identical email to many recipients, one SMTP transaction per
+    batch. Each batch's recipients are listed in To: so they can see who
+    else got it and reply to all.
+    """
+    for start in range(0, len(to_emails), BULK_RECIPIENT_LIMIT):
+        batch = to_emails[start:start + BULK_RECIPIENT_LIMIT]
+        msg = _build_message(", ".join(batch), subject, html_body, text_body)
+        payload = msg.as_bytes(policy=msg.policy.clone(linesep='\r\n'))
+        success, message = _deliver(
+            lambda server: server.sendmail(SENDER_EMAIL, batch, payload),
+            "Email sent successfully",
+        )
+        if not success:
+            return False, message
+    
+    return True, f"Email sent to {len(to_emails)} recipients"
+
+def _report_send_result(future):
+    """Log failures from background sends, since no caller is waiting on them"""
+    error = future.exception()
+    if error:
+        print(f"[WARN] Failed to send email: {error}")
+        return
+    success, message = future.result()
+    if not success:
+        print(f"[WARN] {message}")
+
+def _queue(task, *args, queued_message="Email queued for delivery"):
+    """
+    Run task(*args) on the email pool, or inline when background sends are
+    off; returns (success, message) either way. Failures are logged, not
+    raised.
+    """
+    if SEND_IN_BACKGROUND:
+        future = _EMAIL_EXECUTOR.submit(task, *args)
+        future.add_done_callback(_report_send_result)
+        return True, queued_message
+    
+    try:
+        success, message = task(*args)
+    except Exception as e:
+        success, message = False, f"Failed to send email: {e}"
+    if not success:
+        print(f"[WARN] {message}")
+    return success, message
+
+def _background(render):
+    """
+    Turn render(...) -> (to_email, subject, html_body, text_body) into a
+    mailer that renders and sends entirely on the email pool (when background
+    sends are on), so the calling request only pays for queueing the job
+    """
+    def task(*args):
+        return _send_email_sync(*render(*args))
+
+    @wraps(render)
+    def mailer(*args):
+        return _queue(task, *args)
+    return mailer
+
+def send_email(to_email, subject, html_body, text_body=None):
+    """
+    Queue an email for background delivery (sent inline on serverless)
+    """
+    return _queue(_send_email_sync, to_email, subject, html_body, text_body)
+
+def send_bulk_email(to_emails, subject, html_body, text_body=None, wait=False):
+    """
+    Queue the same email for background delivery to several recipients
+    (sent inline on serverless, or when wait=True so the caller gets the
+    real result).
+    
+    Use this when every recipient gets an identical body; personalized mail
+    (usernames, codes) should go through send_email per recipient.
+    """
+    to_emails = list(to_emails)
+    if wait:
+        return _send_bulk_email_sync(to_emails, subject, html_body, text_body)
+    return _queue(_send_bulk_email_sync, to_emails, subject, html_body, text_body,
+                  queued_message=f"Email queued for delivery to {len(to_emails)} recipients")
+
+@_background
+def send_welcome_email(user_email, username):
+    """Welcome email after successful account creation"""
+    from .templates import WELCOME_HTML, WELCOME_TEXT
+
+    subject = "Welcome to AI Meeting Agent! 🎉"
+    
+    html_body = WELCOME_HTML.format(username=username)
+    text_body = WELCOME_TEXT.format(username=username)
+    
+    return user_email, subject, html_body, text_body
+
+@_background
+def send_integration_success_email(user_email, username, integration_name):
+    """Email after successful integration"""
+    from .templates import INTEGRATION_HTML
+
+    subject = f"{integration_name} Integration Successful! ✅"
+    
+    html_body = INTEGRATION_HTML.format(
+        username=username,
+        integration_name=integration_name,
+        integration_name_lower=integration_name.lower(),
+    )
+    
+    return user_email, subject, html_body, None
+
+@_background
+def send_password_reset_email(user_email, username, otp_code):
+    """Password reset email with OTP"""
+    from .templates import RESET_HTML, RESET_TEXT
+
+    subject = "Password Reset Code - AI Meeting Agent 🔐"
+    
+    html_body = RESET_HTML.format(username=username, otp_code=otp_code)
+    text_body = RESET_TEXT.format(username=username, otp_code=otp_code)
+    
+    return user_email, subject, html_body, text_body
+
+@_background
+def send_email_verification(user_email, username, otp_code):
+    """Email verification OTP after account creation"""
+    from .templates import VERIFICATION_HTML, VERIFICATION_TEXT
+
+    subject = "Verify Your Email - AI Meeting Agent"
+    
+    html_body = VERIFICATION_HTML.format(username=username, otp_code=otp_code)
+    text_body = VERIFICATION_TEXT.format(username=username, otp_code=otp_code)
+    
+    return user_email, subject, html_body, text_body
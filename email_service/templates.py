@@ -1,45 +1,11 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
+"""
+HTML and plain-text bodies for the transactional emails.
 
-SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "")
-SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD", "")
-
-def send_email(to_email, subject, html_body, text_body=None):
-    """
-    Send an email with HTML content
-    """
-    try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = to_email
-        
-        # Add text version if provided
-        if text_body:
-            part1 = MIMEText(text_body, 'plain')
-            msg.attach(part1)
-        
-        # Add HTML version
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.send_message(msg)
-        
-        return True, "Email sent successfully"
-    except Exception as e:
-        return False, f"Failed to send email: {e}"
-
-def send_welcome_email(user_email, username):
-    """Send welcome email after successful account creation"""
-    subject = "Welcome to AI Meeting Agent! 🎉"
-    
-    html_body = f"""
+These are str.format templates (CSS braces are doubled). The module is only
+imported the first time one of these emails is sent, so requests that never
+send mail don't carry the template strings.
+"""
+WELCOME_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -89,8 +55,8 @@ def send_welcome_email(user_email, username):
     </body>
     </html>
     """
-    
-    text_body = f"""
+
+WELCOME_TEXT = """
     Welcome to AI Meeting Agent!
     
     Hi {username}!
@@ -106,14 +72,8 @@ def send_welcome_email(user_email, username):
     
     Need help? Reply to this email for support.
     """
-    
-    return send_email(user_email, subject, html_body, text_body)
 
-def send_integration_success_email(user_email, username, integration_name):
-    """Send email after successful integration"""
-    subject = f"{integration_name} Integration Successful! ✅"
-    
-    html_body = f"""
+INTEGRATION_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -136,7 +96,7 @@ def send_integration_success_email(user_email, username, integration_name):
                 <p>Your {integration_name} integration has been successfully set up. You can now:</p>
                 
                 <ul style="color: #e5e5e5; line-height: 1.6;">
-                    <li>Automatically create {integration_name.lower()} items from meeting action items</li>
+                    <li>Automatically create {integration_name_lower} items from meeting action items</li>
                     <li>Keep your workflow synchronized with AI Meeting Agent</li>
                     <li>Save time on manual task creation</li>
                 </ul>
@@ -151,14 +111,8 @@ def send_integration_success_email(user_email, username, integration_name):
     </body>
     </html>
     """
-    
-    return send_email(user_email, subject, html_body)
 
-def send_password_reset_email(user_email, username, otp_code):
-    """Send password reset email with OTP"""
-    subject = "Password Reset Code - AI Meeting Agent 🔐"
-    
-    html_body = f"""
+RESET_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -197,8 +151,8 @@ def send_password_reset_email(user_email, username, otp_code):
     </body>
     </html>
     """
-    
-    text_body = f"""
+
+RESET_TEXT = """
     Password Reset Code - AI Meeting Agent
     
     Hi {username},
@@ -211,14 +165,8 @@ def send_password_reset_email(user_email, username, otp_code):
     
     If you didn't request this password reset, please ignore this email.
     """
-    
-    return send_email(user_email, subject, html_body, text_body)
 
-def send_email_verification(user_email, username, otp_code):
-    """Send email verification OTP after account creation"""
-    subject = "Verify Your Email - AI Meeting Agent"
-    
-    html_body = f"""
+VERIFICATION_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -278,8 +226,8 @@ def send_email_verification(user_email, username, otp_code):
     </body>
     </html>
     """
-    
-    text_body = f"""
+
+VERIFICATION_TEXT = """
     Verify Your Email - AI Meeting Agent
     
     Hi {username}!
@@ -298,5 +246,3 @@ def send_email_verification(user_email, username, otp_code):
     
     AI Meeting Agent Team
     """
-    
-    return send_email(user_email, subject, html_body, text_body)
@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 
 # Create extension instances without initializing them
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 login_manager = LoginManager()
+limiter = Limiter(key_func=get_remote_address)
@@ -1,33 +1,44 @@
-import os
 import json
-import smtplib
-from email.mime.text import MIMEText
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from jira import JIRA  # Make sure this is imported
-from jira.exceptions import JIRAError  # Import specific Jira errors
+from bson import ObjectId
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
+from jinja2 import FileSystemBytecodeCache
+from flask_limiter.util import get_remote_address
 from flask_login import login_user, logout_user, login_required, current_user
-import google.generativeai as genai
-from trello import TrelloClient
 import mongoengine
 
-from extensions import bcrypt, login_manager
-from mongo_models import User, Team, TrelloCredentials, TrelloCard, JiraCredentials
-from email_service import send_welcome_email, send_integration_success_email, send_password_reset_email, send_email_verification
-from dotenv import load_dotenv
+from extensions import bcrypt, limiter, login_manager
+from mongo_models import User, Team, TrelloCredentials, TrelloCard, JiraCredentials, ensure_indexes
+from email_service import send_bulk_email, send_welcome_email, send_integration_success_email, send_password_reset_email, send_email_verification
+from config import env
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
 # Get environment variables with fallbacks
-TRELLO_API_KEY = os.environ.get("TRELLO_API_KEY", "")
-TRELLO_API_SECRET = os.environ.get("TRELLO_API_SECRET", "")
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
-SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "")
-SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD", "")
-FLASK_SECRET_KEY = os.environ.get("FLASK_SECRET_KEY", "mongodb-secret-key-v2")
-MONGO_URL = os.environ.get("MONGO_URL", "")
+TRELLO_API_KEY = env("TRELLO_API_KEY", "")
+TRELLO_API_SECRET = env("TRELLO_API_SECRET", "")
+GEMINI_API_KEY = env("GEMINI_API_KEY", "")
+SENDER_EMAIL = env("SENDER_EMAIL", "")
+SENDER_PASSWORD = env("SENDER_PASSWORD", "")
+FLASK_SECRET_KEY = env("FLASK_SECRET_KEY", "mongodb-secret-key-v2")
+MONGO_URL = env("MONGO_URL", "")
+REDIS_URL = env("REDIS_URL", "")
+
+# Trello's token authorization page; fixed for the life of the process
+_TRELLO_AUTH_URL = (
+    f"https://trello.com/1/authorize?key={TRELLO_API_KEY}&name=AI%20Agent"
+    "&expiration=never&response_type=token&scope=read,write"
+) if TRELLO_API_KEY else None
 
 # Log configuration status (without exposing secrets)
 print(f"    - TRELLO_API_KEY: {'✓ Set' if TRELLO_API_KEY else '✗ Missing'}")
@@ -35,6 +46,95 @@ print(f"    - GEMINI_API_KEY: {'✓ Set' if GEMINI_API_KEY else '✗ Missing'}")
 print(f"    - MONGO_URL: {'✓ Set' if MONGO_URL else '✗ Missing'}")
 print(f"    - EMAIL: {'✓ Set' if SENDER_EMAIL and SENDER_PASSWORD else '✗ Missing'}")
 
+# Structured-output schema for the transcript analysis. Gemini is asked to
+# return JSON matching it directly instead of free text we have to clean up.
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "decisions": {"type": "array", "items": {"type": "string"}},
+        "action_items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "task": {"type": "string"},
+                    "assignee": {"type": "string"},
+                    "due_date": {"type": "string"},
+                },
+                "required": ["task", "assignee", "due_date"],
+            },
+        },
+    },
+    "required": ["summary", "decisions", "action_items"],
+}
+# Upper bound on how long a single analysis may hold a web worker
+GEMINI_TIMEOUT_SECONDS = 60
+# Transcripts longer than this are rejected before building a prompt;
+# above the streaming threshold the response is read back in chunks
+MAX_TRANSCRIPT_CHARS = 500_000
+STREAM_TRANSCRIPT_CHARS = 50_000
+
+# The analysis prompt is static around the transcript, so it is built once
+_PROMPT_PREFIX = """
+Analyze the following meeting transcript. Provide your analysis ONLY in a valid JSON object format. Do not include any text, markdown formatting, or explanations before or after the JSON object.
+
+The JSON object must have these top-level keys: "summary", "decisions", "action_items".
+- "summary": (string) A concise, one-paragraph summary.
+- "decisions": (list of strings) A list of all concrete decisions made.
+- "action_items": (list of objects) A list of tasks. Each object must have: "task" (string), "assignee" (string), and "due_date" (string, use "Not specified" if none).
+
+Transcript:
+---
+"""
+_PROMPT_SUFFIX = """
+---
+
+JSON Analysis:
+"""
+# Session user ids are 24-char hex ObjectId strings
+_OID_RE = re.compile(r'^[0-9a-f]{24}$')
+
+# Markdown code fences the model may still wrap around the JSON
+_FENCE_RE = re.compile(r'^\s*```(?:json)?|```\s*$')
+
+# Integration URLs are matched whole, so lookalikes such as
+# https://evil.com#.atlassian.net are rejected
+_JIRA_URL_RE = re.compile(r'https://[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.atlassian\.net/?', re.I)
+_SLACK_HOOK_RE = re.compile(r'https://hooks\.slack\.com/services/T[A-Z0-9]+/B[A-Z0-9]+/[A-Za-z0-9]+')
+
+# Shared HTTP session for outbound webhooks: keeps TLS connections alive
+# between calls. Webhook POSTs aren't idempotent, so they are only retried
+# when the message was certainly not delivered: connection failures and
+# 429/503 rejections. Read timeouts and other 5xx may come after delivery.
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(
+    total=3, read=0, other=0, backoff_factor=0.3, status_forcelist=[429, 503],
+    allowed_methods=frozenset({"GET", "POST"}), raise_on_status=False)))
+
+# Trello boards/lists and Jira projects/issue types rarely change minute to
+# minute, so they are cached per user instead of refetched on every page load
+INTEGRATION_CACHE_TTL = 300
+_boards_cache = TTLCache(maxsize=1024, ttl=INTEGRATION_CACHE_TTL)
+_lists_cache = TTLCache(maxsize=1024, ttl=INTEGRATION_CACHE_TTL)
+_jira_projects_cache = TTLCache(maxsize=1024, ttl=INTEGRATION_CACHE_TTL)
+_jira_issue_types_cache = TTLCache(maxsize=1024, ttl=INTEGRATION_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+# Emails known to belong to an account, for the /register uniqueness check.
+# Only hits are cached: an account never stops existing, and a stale miss
+# is still caught by the unique index on insert. Login never uses this.
+USER_CACHE_TTL = 30
+_registered_emails_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+
+# Fields the OTP flows read; their writes are targeted update_one calls
+_VERIFICATION_FIELDS = ('username', 'email', 'is_verified', 'verification_token', 'verification_token_expires')
+_RESET_FIELDS = ('username', 'email', 'reset_token', 'reset_token_expires')
+
+# Password hashing is deliberately slow and releases the GIL, so registration
+# runs it here while the uniqueness queries are in flight
+_hash_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hash")
+
 
 def create_app():
     app = Flask(__name__)
@@ -45,6 +145,19 @@ def create_app():
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
     app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
+    # Let a transcript up to MAX_TRANSCRIPT_CHARS through form parsing even
+    # at 4 bytes per UTF-8 character; the analyzer applies the real limit
+    app.config['MAX_FORM_MEMORY_SIZE'] = MAX_TRANSCRIPT_CHARS * 4
+    # Rate limit counters must be shared across workers/instances to mean
+    # anything in production; in-memory is only good for a single process
+    app.config['RATELIMIT_STORAGE_URI'] = REDIS_URL or 'memory://'
+
+    # Keep compiled templates on disk so a fresh process (e.g. a serverless
+    # cold start) loads bytecode instead of re-parsing every template.
+    # Outside debug Flask already leaves auto_reload off. Jinja's default
+    # directory is private to this uid (0700, ownership checked), so other
+    # local users can't plant bytecode for us to load.
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
     # --- MongoDB Configuration ---
     print("\n" + "="*60)
@@ -80,126 +193,228 @@ def create_app():
     
     print("="*60 + "\n")
 
+    # Index builds are a round trip per index, too slow for every serverless
+    # cold start; the worker builds them at startup, or run this once
+    # after changing model indexes: flask --app wsgi ensure-indexes
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes_command():
+        """Create the MongoDB indexes declared on the models"""
+        ensure_indexes()
+        print("[✓] Indexes ensured")
+
     bcrypt.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'login'
+    limiter.init_app(app)
+
+    @app.errorhandler(429)
+    def too_many_requests(e):
+        message = 'Too many attempts. Please wait a while and try again.'
+        if request.endpoint == 'resend_verification':
+            return jsonify({'success': False, 'message': message}), 429
+        flash(message, 'error')
+        if request.endpoint == 'verify_reset_code':
+            return render_template('verify_reset_code.html', email=request.view_args['email'], step='verify'), 429
+        if request.endpoint == 'forgot_password':
+            return render_template('forgot_password.html'), 429
+        return render_template('login.html'), 429
 
+    # Flask-Login already memoizes the loaded user for the rest of the
+    # request, so this runs once per request: reject malformed ids without a
+    # query and load only the fields request handling uses.
     @login_manager.user_loader
     def load_user(user_id):
         try:
-            # Handle MongoDB ObjectId properly
-            from bson import ObjectId
-            if isinstance(user_id, str) and len(user_id) == 24:
-                try:
-                    # Try to convert to ObjectId if it's a valid 24-character hex string
-                    obj_id = ObjectId(user_id)
-                    user = User.objects(id=obj_id).first()
-                    if user:
-                        print(f"[✓] User loaded: {user.username} (ID: {user.id})")
-                    return user
-                except Exception as e:
-                    # If conversion fails, it's an invalid ObjectId
-                    print(f"[✗] Failed to load user: {e}")
-                    return None
-            else:
+            if not isinstance(user_id, str) or not _OID_RE.match(user_id):
                 # For invalid ID formats (like old integer IDs), silently return None
                 # This handles the migration from SQLAlchemy to MongoDB
                 return None
-        except Exception as e:
-            print(f"[ERROR] Failed to load user {user_id}: {e}")
+            user = User.objects(id=ObjectId(user_id)) \
+                .only('username', 'email', 'password_hash', 'is_verified', 'team_id').first()
+            logger.debug("session user loaded id=%s found=%s", user_id, user is not None)
+            return user
+        except Exception:
+            logger.exception("Failed to load user %s", user_id)
             return None
 
-    # --- AI MODEL AND HELPER FUNCTIONS (Unchanged) ---
+    # --- AI MODEL AND HELPER FUNCTIONS ---
+    # jira, trello and google.generativeai are slow to import, so they are
+    # imported where first used rather than at module load (cold starts).
     model = None
-    try:
-        if GEMINI_API_KEY:
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        else:
-            model = None
-    except Exception as e:
-        model = None
-        print(f"[WARN] Failed to configure Gemini AI: {e}")
+
+    def get_model():
+        """Configure Gemini and build the model on first use"""
+        nonlocal model
+        if model is None and GEMINI_API_KEY:
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                model = genai.GenerativeModel('gemini-2.0-flash-exp', generation_config={
+                    'response_mime_type': 'application/json',
+                    'response_schema': ANALYSIS_SCHEMA,
+                })
+            except Exception as e:
+                print(f"[WARN] Failed to configure Gemini AI: {e}")
+        return model
 
     def analyze_transcript_with_ai(transcript_text):
+        model = get_model()
         if not model: return {"error": "AI model not configured."}
-        # --- PROMPT RESTORED ---
-        prompt = f"""
-        Analyze the following meeting transcript. Provide your analysis ONLY in a valid JSON object format. Do not include any text, markdown formatting, or explanations before or after the JSON object.
-
-        The JSON object must have these top-level keys: "summary", "decisions", "action_items".
-        - "summary": (string) A concise, one-paragraph summary.
-        - "decisions": (list of strings) A list of all concrete decisions made.
-        - "action_items": (list of objects) A list of tasks. Each object must have: "task" (string), "assignee" (string), and "due_date" (string, use "Not specified" if none).
-
-        Transcript:
-        ---
-        {transcript_text}
-        ---
-
-        JSON Analysis:
-        """
+        if len(transcript_text) > MAX_TRANSCRIPT_CHARS:
+            return {"error": "Transcript too long; please split it into smaller parts."}
+        prompt = _PROMPT_PREFIX + transcript_text + _PROMPT_SUFFIX
         try:
-            response = model.generate_content(prompt);
-            print(f"Raw AI: {response.text}")
-            json_text = response.text.strip().replace('```json', '').replace('```', '').strip()
+            if len(transcript_text) > STREAM_TRANSCRIPT_CHARS:
+                response = model.generate_content(prompt, stream=True,
+                                                  request_options={'timeout': GEMINI_TIMEOUT_SECONDS})
+                raw_text = "".join(chunk.text for chunk in response)
+            else:
+                response = model.generate_content(prompt, request_options={'timeout': GEMINI_TIMEOUT_SECONDS})
+                raw_text = response.text
+            print(f"Raw AI: {raw_text}")
+            json_text = _FENCE_RE.sub('', raw_text).strip()
             if not json_text: return {"error": "AI empty response."}
             return json.loads(json_text)
         except json.JSONDecodeError as e:
-            return {"error": f"AI JSON Parse Error: {e}. Raw: '{response.text}'"}
+            return {"error": f"AI JSON Parse Error: {e}. Raw: '{raw_text}'"}
         except Exception as e:
             return {"error": f"AI Error: {e}"}
 
+    # Credentials and API clients are looked up at most once per request and
+    # memoized on flask.g; several helpers and routes need them. Read-only
+    # lookups come back as raw dicts (as_pymongo) to skip Document
+    # construction; templates read them the same way.
+    def get_trello_credentials(user):
+        if 'trello_creds' not in g:
+            g.trello_creds = TrelloCredentials.objects(user_id=str(user.id)) \
+                .only('token', 'trello_username').as_pymongo().first()
+        return g.trello_creds
+
+    def get_jira_credentials(user):
+        if 'jira_creds' not in g:
+            g.jira_creds = JiraCredentials.objects(user_id=str(user.id)) \
+                .only('jira_url', 'email', 'api_token').as_pymongo().first()
+        return g.jira_creds
+
+    def get_team(team_id, *fields):
+        """Fetch the given team fields as a raw dict for read-only use"""
+        return Team.objects(id=team_id).only(*fields).as_pymongo().first()
+
     def get_trello_client(user):
-        creds = TrelloCredentials.objects(user_id=str(user.id)).first()
-        if creds: 
-            return TrelloClient(api_key=TRELLO_API_KEY, api_secret=TRELLO_API_SECRET, token=creds.token)
-        return None
+        if 'trello_client' not in g:
+            creds = get_trello_credentials(user)
+            g.trello_client = None
+            if creds:
+                from trello import TrelloClient
+                g.trello_client = TrelloClient(api_key=TRELLO_API_KEY, api_secret=TRELLO_API_SECRET, token=creds['token'])
+        return g.trello_client
+
+    def cached(cache, key, fetch):
+        """Return cache[key], calling fetch() to fill it on a miss"""
+        with _cache_lock:
+            value = cache.get(key)
+        if value is None:
+            value = fetch()
+            with _cache_lock:
+                cache[key] = value
+        return value
+
+    def invalidate_cached(user_id, *caches):
+        """Drop a user's entries (keyed by user_id or (user_id, ...)) from caches"""
+        with _cache_lock:
+            for cache in caches:
+                for key in [k for k in cache if k == user_id or (isinstance(k, tuple) and k[0] == user_id)]:
+                    cache.pop(key, None)
+
+    def email_registered(email):
+        """Whether an account uses this email (positive answers are cached)"""
+        with _cache_lock:
+            if email in _registered_emails_cache:
+                return True
+        if User.objects(email=email).only('id').as_pymongo().first() is None:
+            return False
+        with _cache_lock:
+            _registered_emails_cache[email] = True
+        return True
+
+    def get_trello_boards(user):
+        trello_client = get_trello_client(user)
+        if not trello_client:
+            return []
+        # Only id/name are rendered, so ask Trello for just those as plain
+        # dicts rather than full py-trello Board objects
+        return cached(_boards_cache, str(user.id), lambda: trello_client.fetch_json(
+            'members/me/boards', query_params={'fields': 'id,name', 'filter': 'open'}))
 
+    @app.teardown_request
+    def close_api_clients(exc):
+        jira_client = g.pop('jira_client', None)
+        if jira_client:
+            jira_client.close()
+
+    # The automation helpers below return (ok, message) so /analyze can pick
+    # the notification type without inspecting the message text.
     def send_summary_email(recipients, analysis):
-        if not SENDER_EMAIL or not SENDER_PASSWORD: return "Email creds not configured."
+        if not SENDER_EMAIL or not SENDER_PASSWORD: return False, "Email creds not configured."
         subject = "Meeting Summary & Action Items"
-        body = f"<h2>Summary</h2><p>{analysis.get('summary', 'N/A')}</p>"
-        body += "<h2>Decisions</h2><ul>" + "".join([f"<li>{d}</li>" for d in analysis.get('decisions', [])]) + "</ul>"
-        body += "<h2>Action Items</h2><ul>" + "".join([
-                                                          f"<li><b>Task:</b> {i.get('task', 'N/A')} | <b>Assignee:</b> {i.get('assignee', 'N/A')} | <b>Due:</b> {i.get('due_date', 'N/A')}</li>"
-                                                          for i in analysis.get('action_items', [])]) + "</ul>"
-        msg = MIMEText(body, 'html');
-        msg['Subject'], msg['From'], msg['To'] = subject, SENDER_EMAIL, ", ".join(recipients)
-        try:
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-                server.login(SENDER_EMAIL, SENDER_PASSWORD); server.send_message(msg)
-            return "Email sent successfully."
-        except Exception as e:
-            return f"Failed to send email: {e}"
+        parts = [f"<h2>Summary</h2><p>{analysis.get('summary', 'N/A')}</p>", "<h2>Decisions</h2><ul>"]
+        parts.extend(f"<li>{d}</li>" for d in analysis.get('decisions', []))
+        parts.append("</ul><h2>Action Items</h2><ul>")
+        parts.extend(f"<li><b>Task:</b> {i.get('task', 'N/A')} | <b>Assignee:</b> {i.get('assignee', 'N/A')} | <b>Due:</b> {i.get('due_date', 'N/A')}</li>"
+                     for i in analysis.get('action_items', []))
+        parts.append("</ul>")
+        body = "".join(parts)
+        # Goes out over email_service's pooled SMTP connection as a single
+        # transaction for the whole team instead of a fresh login per send.
+        # This already runs off the request thread alongside the other
+        # automations, so wait for the real result to report it.
+        return send_bulk_email(recipients, subject, body, wait=True)
 
     def create_trello_cards(client, board_id, list_id, action_items, user_id):
         try:
             target_list = client.get_list(list_id);
-            cards_created = 0
-            for item in action_items:
-                card_name = item.get('task', 'Untitled Task')
-                card_desc = f"Assignee: {item.get('assignee', 'N/A')}\nDue Date: {item.get('due_date', 'N/A')}"
-                new_card = target_list.add_card(name=card_name, desc=card_desc);
-                cards_created += 1
-                db_card = TrelloCard(
-                    card_id=new_card.id, 
-                    user_id=str(user_id), 
-                    board_id=board_id, 
-                    list_id=list_id,
-                    task_description=item.get('task', 'No desc'), 
-                    assignee=item.get('assignee'),
-                    due_date_str=item.get('due_date')
-                )
-                db_card.save()
-            return f"{cards_created} Trello cards created."
         except Exception as e:
-            return f"Failed Trello cards: {e}"
+            return False, f"Failed Trello cards: {e}"
+        user_id = str(user_id)
+
+        def add_card(item):
+            """Create the card on Trello; returns its (unsaved) TrelloCard record, or None on failure"""
+            task, assignee, due_date = item.get('task'), item.get('assignee'), item.get('due_date')
+            card_desc = f"Assignee: {assignee or 'N/A'}\nDue Date: {due_date or 'N/A'}"
+            try:
+                new_card = target_list.add_card(name=task or 'Untitled Task', desc=card_desc)
+            except Exception:
+                return None
+            return TrelloCard(
+                card_id=new_card.id, 
+                user_id=user_id, 
+                board_id=board_id, 
+                list_id=list_id,
+                task_description=task or 'No desc', 
+                assignee=assignee,
+                due_date_str=due_date
+            )
+
+        # One at a time so cards land on the list in action-item order
+        results = [(item, add_card(item)) for item in action_items]
+        docs = [doc for _, doc in results if doc is not None]
+        failed_items = [item.get('task') or 'Untitled Task' for item, doc in results if doc is None]
+        # One bulk write instead of a save() round trip per card; cards that
+        # made it to Trello are recorded even if others failed
+        if docs:
+            try:
+                TrelloCard.objects.insert(docs, load_bulk=False)
+            except Exception as e:
+                return False, f"Created {len(docs)} Trello cards but failed to record them: {e}"
+
+        if not failed_items:
+            return True, f"{len(docs)} Trello cards created."
+        return False, f"Created {len(docs)} cards. Failed for: {', '.join(failed_items)}."
 
     def send_to_slack(team, analysis):
-        if not team or not team.slack_webhook_url:
-            return "Slack is not configured for this team."
-        webhook_url = team.slack_webhook_url
+        if not team or not team.get('slack_webhook_url'):
+            return False, "Slack is not configured for this team."
+        webhook_url = team['slack_webhook_url']
 
         # --- SLACK BLOCKS RESTORED ---
         blocks = [
@@ -230,7 +445,7 @@ def create_app():
                     "type": "section",
                     "text": {
                         "type": "mrkdwn",
-                        "text": "*⚖️ Key Decisions:*\n" + "\n".join([f"• {d}" for d in decisions])
+                        "text": "*⚖️ Key Decisions:*\n" + "\n".join(f"• {d}" for d in decisions)
                     }
                 },
                 {"type": "divider"}
@@ -238,9 +453,9 @@ def create_app():
         # Add Action Items if any
         action_items = analysis.get('action_items')
         if action_items:
-            action_items_text = "*✅ Action Items:*\n"
-            for item in action_items:
-                action_items_text += f"• *Task:* {item.get('task', 'N/A')} | *Assignee:* {item.get('assignee', 'N/A')} | *Due:* {item.get('due_date', 'N/A')}\n"
+            action_items_text = "*✅ Action Items:*\n" + "".join(
+                f"• *Task:* {item.get('task', 'N/A')} | *Assignee:* {item.get('assignee', 'N/A')} | *Due:* {item.get('due_date', 'N/A')}\n"
+                for item in action_items)
             blocks.append({
                 "type": "section",
                 "text": {
@@ -252,28 +467,34 @@ def create_app():
 
         payload = {"blocks": blocks}
         try:
-            response = requests.post(webhook_url, json=payload, timeout=10)
+            response = HTTP.post(webhook_url, json=payload, timeout=10)
             response.raise_for_status()
             if response.text == 'ok':
-                return True
+                return True, "Summary posted."
             else:
-                return False
+                return False, "Failed to post summary."
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] Slack request failed: {e}")
-            return False
+            return False, "Failed to post summary."
         except Exception as e:
             print(f"[ERROR] Slack notification failed: {e}")
-            return False
+            return False, "Failed to post summary."
 
     # --- JIRA HELPER FUNCTIONS (Unchanged) ---
     def get_jira_client(user):
-        creds = JiraCredentials.objects(user_id=str(user.id)).first()
+        if 'jira_client' in g:
+            return g.jira_client
+        g.jira_client = None
+        creds = get_jira_credentials(user)
         if not creds: 
             return None
+        from jira import JIRA
+        from jira.exceptions import JIRAError
         try:
-            jira_client = JIRA(server=creds.jira_url, basic_auth=(creds.email, creds.api_token))
-            jira_client.server_info()
-            return jira_client
+            # The constructor already fetches server info, which validates the
+            # credentials; no separate probe is needed.
+            g.jira_client = JIRA(server=creds['jira_url'], basic_auth=(creds['email'], creds['api_token']))
+            return g.jira_client
         except JIRAError as e:
             flash(f"Jira Connection Error: {e.text}", "danger");
             return None
@@ -281,31 +502,36 @@ def create_app():
             flash(f"Jira Initialization Error: {e}", "danger");
             return None
 
-    def create_jira_issues(user, action_items, project_key, issue_type_name):
-        jira_client = get_jira_client(user)
-        if not jira_client: return "Failed to connect to Jira. Check credentials."
-        if not action_items: return "No action items to create."
-        if not project_key or not issue_type_name: return "Jira Project/Issue Type required."
-
-        issues_created = 0;
-        failed_items = []
-        for item in action_items:
-            summary = item.get('task', 'Untitled Meeting Task')
-            description = f"Assignee: {item.get('assignee', 'Unassigned')}\nDue Date: {item.get('due_date', 'Not specified')}"
-            issue_dict = {'project': {'key': project_key}, 'summary': summary, 'description': description,
-                          'issuetype': {'name': issue_type_name}}
+    def create_jira_issues(jira_client, action_items, project_key, issue_type_name):
+        # Takes an already-resolved client: this runs off the request thread,
+        # where get_jira_client's g/flash are not available.
+        if not jira_client: return False, "Failed to connect to Jira. Check credentials."
+        if not action_items: return True, "No action items to create."
+        if not project_key or not issue_type_name: return False, "Jira Project/Issue Type required."
+
+        # Same project/issue type for every item; only summary/description vary
+        project = {'key': project_key}
+        issuetype = {'name': issue_type_name}
+
+        def create_issue(item):
+            """Create one issue; returns the summary on failure, None on success"""
+            summary = item.get('task') or 'Untitled Meeting Task'
+            description = f"Assignee: {item.get('assignee') or 'Unassigned'}\nDue Date: {item.get('due_date') or 'Not specified'}"
+            issue_dict = {'project': project, 'summary': summary, 'description': description, 'issuetype': issuetype}
             try:
-                new_issue = jira_client.create_issue(fields=issue_dict)
-                issues_created += 1
-            except JIRAError as e:
-                failed_items.append(summary)
-            except Exception as e:
-                failed_items.append(summary)
+                jira_client.create_issue(fields=issue_dict)
+                return None
+            except Exception:
+                return summary
+
+        # Sequential so issue keys follow the meeting's action-item order
+        failed_items = [summary for summary in map(create_issue, action_items) if summary]
+        issues_created = len(action_items) - len(failed_items)
 
         if not failed_items:
-            return f"{issues_created} Jira issues created in {project_key}."
+            return True, f"{issues_created} Jira issues created in {project_key}."
         else:
-            return f"Created {issues_created} issues. Failed for: {', '.join(failed_items)}."
+            return False, f"Created {issues_created} issues. Failed for: {', '.join(failed_items)}."
 
     # --- ROUTES ---
     @app.route('/')
@@ -319,17 +545,16 @@ def create_app():
     @app.route('/dashboard')
     @login_required
     def dashboard():
-        trello_client = get_trello_client(current_user)
-        boards = trello_client.list_boards() if trello_client else []
+        boards = get_trello_boards(current_user)
         
         # Get user's integration credentials for the template
-        trello_creds = TrelloCredentials.objects(user_id=str(current_user.id)).first()
-        jira_creds = JiraCredentials.objects(user_id=str(current_user.id)).first()
+        trello_creds = get_trello_credentials(current_user)
+        jira_creds = get_jira_credentials(current_user)
         
         # Get user's team data if they belong to a team
         team_data = None
         if current_user.team_id:
-            team_data = Team.objects(id=current_user.team_id).first()
+            team_data = get_team(current_user.team_id, 'slack_webhook_url')
         
         return render_template('index.html', 
                              trello_boards=boards, 
@@ -345,8 +570,10 @@ def create_app():
         if not trello_client:
             return jsonify({"error": "Trello not connected"}), 400
         try:
-            board = trello_client.get_board(board_id)
-            lists = [{"id": lst.id, "name": lst.name} for lst in board.list_lists()]
+            # The board's open lists come back nested in the board resource,
+            # already trimmed to the id/name the dropdown needs
+            lists = cached(_lists_cache, (str(current_user.id), board_id), lambda: trello_client.fetch_json(
+                f'boards/{board_id}', query_params={'fields': 'id', 'lists': 'open', 'list_fields': 'id,name'})['lists'])
             return jsonify(lists)
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -359,9 +586,10 @@ def create_app():
     def get_jira_projects():
         jira_client = get_jira_client(current_user)
         if not jira_client: return jsonify({"error": "Jira not connected or credentials invalid."}), 400
+        from jira.exceptions import JIRAError
         try:
-            projects = jira_client.projects()
-            project_list = [{"key": p.key, "name": p.name} for p in projects]
+            project_list = cached(_jira_projects_cache, str(current_user.id), lambda: [
+                {"key": p.key, "name": p.name} for p in jira_client.projects()])
             return jsonify(project_list)
         except JIRAError as e:
             return jsonify({"error": f"Jira API Error: {e.text}"}), 500
@@ -373,10 +601,10 @@ def create_app():
     def get_jira_issue_types(project_key):
         jira_client = get_jira_client(current_user)
         if not jira_client: return jsonify({"error": "Jira not connected or credentials invalid."}), 400
+        from jira.exceptions import JIRAError
         try:
-            project = jira_client.project(project_key)
-            issue_types = project.issueTypes
-            issue_type_list = [{"id": it.id, "name": it.name, "subtask": it.subtask} for it in issue_types]
+            issue_type_list = cached(_jira_issue_types_cache, (str(current_user.id), project_key), lambda: [
+                {"id": it.id, "name": it.name, "subtask": it.subtask} for it in jira_client.project(project_key).issueTypes])
             return jsonify(issue_type_list)
         except JIRAError as e:
             return jsonify({"error": f"Jira API Error: {e.text}"}), 500
@@ -386,99 +614,107 @@ def create_app():
     @app.route('/analyze', methods=['POST'])
     @login_required
     def analyze():
+        transcript_text, analysis_result = None, None
         try:
-            # Debug logging
-            
             transcript_text = request.form.get('transcript')
-            analysis_result, notification = None, None
             
             if not transcript_text or not transcript_text.strip():
                 flash("Please provide a meeting transcript to analyze.", "error")
-                trello_client = get_trello_client(current_user)
-                boards = trello_client.list_boards() if trello_client else []
-                return render_template('index.html', trello_boards=boards)
-            
-            if transcript_text:
+            else:
                 analysis_result = analyze_transcript_with_ai(transcript_text)
                 if analysis_result and not analysis_result.get('error'):
-                    automation_messages = []
+                    # Read the automation options out of the form once
+                    form = request.form
+                    want_email = form.get('send_email') == 'true'
+                    want_trello = form.get('create_trello') == 'true'
+                    want_slack = form.get('send_slack') == 'true'
+                    want_jira = form.get('create_jira') == 'true'
+                    b_id, l_id = form.get('trello_board_id'), form.get('trello_list_id')
+                    jira_project_key = form.get('jira_project_key')
+                    jira_issue_type_name = form.get('jira_issue_type_name')
+
+                    # (ok, message) per requested automation; options that
+                    # can't run (not connected, missing selection) count as failed
+                    automation_results = []
+                    # (label, callable) pairs; everything request-bound (form
+                    # values, clients, team) is resolved here so the callables
+                    # can run concurrently off the request thread
+                    automations = []
                     action_items_list = analysis_result.get('action_items', [])
                     
                     # Get user's team
                     user_team = None
                     if current_user.team_id:
-                        user_team = Team.objects(id=current_user.team_id).first()
+                        user_team = get_team(current_user.team_id, 'slack_webhook_url')
                     
                     # Email Automation
-                    if request.form.get('send_email') == 'true' and user_team:
+                    if want_email and user_team:
                         # Get team members
-                        team_members = User.objects(team_id=current_user.team_id)
-                        recipients = [m.email for m in team_members if m.email]
+                        team_members = User.objects(team_id=current_user.team_id).only('email').as_pymongo()
+                        recipients = [m['email'] for m in team_members if m.get('email')]
                         if recipients:
-                            automation_messages.append(f"Email: {send_summary_email(recipients, analysis_result)}")
+                            automations.append(("Email", lambda: send_summary_email(recipients, analysis_result)))
                         else:
-                            automation_messages.append("Email: No emails in team.")
-                    elif request.form.get('send_email') == 'true':
-                        automation_messages.append("Email: Requires team.")
+                            automation_results.append((False, "Email: No emails in team."))
+                    elif want_email:
+                        automation_results.append((False, "Email: Requires team."))
                     
                     # Trello Automation
-                    trello_creds = TrelloCredentials.objects(user_id=str(current_user.id)).first()
-                    if request.form.get('create_trello') == 'true' and trello_creds:
+                    if want_trello and get_trello_credentials(current_user):
                         t_client = get_trello_client(current_user)
-                        b_id, l_id = request.form.get('trello_board_id'), request.form.get('trello_list_id')
                         if t_client and b_id and l_id:
-                            automation_messages.append(
-                                f"Trello: {create_trello_cards(t_client, b_id, l_id, action_items_list, current_user.id)}")
+                            user_id = current_user.id
+                            automations.append(("Trello", lambda: create_trello_cards(t_client, b_id, l_id, action_items_list, user_id)))
                         elif not b_id or not l_id:
-                            automation_messages.append("Trello: Board/List missing.")
+                            automation_results.append((False, "Trello: Board/List missing."))
                         else:
-                            automation_messages.append("Trello: Client error.")
-                    elif request.form.get('create_trello') == 'true':
-                        automation_messages.append("Trello: Not connected.")
+                            automation_results.append((False, "Trello: Client error."))
+                    elif want_trello:
+                        automation_results.append((False, "Trello: Not connected."))
                     
                     # Slack Automation
-                    if request.form.get('send_slack') == 'true' and user_team and user_team.slack_webhook_url:
-                        automation_messages.append(f"Slack: {send_to_slack(user_team, analysis_result)}")
-                    elif request.form.get('send_slack') == 'true':
+                    if want_slack and user_team and user_team.get('slack_webhook_url'):
+                        automations.append(("Slack", lambda: send_to_slack(user_team, analysis_result)))
+                    elif want_slack:
                         if not user_team:
-                            automation_messages.append("Slack: Requires team.")
+                            automation_results.append((False, "Slack: Requires team."))
                         else:
-                            automation_messages.append("Slack: Not connected.")
+                            automation_results.append((False, "Slack: Not connected."))
                     
                     # JIRA Automation
-                    jira_creds = JiraCredentials.objects(user_id=str(current_user.id)).first()
-                    if request.form.get('create_jira') == 'true' and jira_creds:
-                        jira_project_key = request.form.get('jira_project_key')
-                        jira_issue_type_name = request.form.get('jira_issue_type_name')
+                    if want_jira and get_jira_credentials(current_user):
                         if not jira_project_key or not jira_issue_type_name:
-                            automation_messages.append("Jira: Project and Issue Type must be selected.")
+                            automation_results.append((False, "Jira: Project and Issue Type must be selected."))
                         else:
-                            jira_status = create_jira_issues(current_user, action_items_list, jira_project_key,
-                                                             jira_issue_type_name)
-                            automation_messages.append(f"Jira: {jira_status}")
-                    elif request.form.get('create_jira') == 'true':
-                        automation_messages.append("Jira: Integration not connected.")
+                            jira_client = get_jira_client(current_user)
+                            automations.append(("Jira", lambda: create_jira_issues(jira_client, action_items_list,
+                                                                                   jira_project_key, jira_issue_type_name)))
+                    elif want_jira:
+                        automation_results.append((False, "Jira: Integration not connected."))
+
+                    # The automations share no state, so run them side by side:
+                    # total latency is the slowest one rather than the sum
+                    if automations:
+                        with ThreadPoolExecutor(max_workers=4) as pool:
+                            futures = [(label, pool.submit(fn)) for label, fn in automations]
+                        for label, future in futures:
+                            ok, message = future.result()
+                            automation_results.append((ok, f"{label}: {message}"))
                     # Notification logic
-                    if automation_messages:
-                        overall_type = "success"
-                        for msg in automation_messages:
-                            if "Failed" in msg or "Error" in msg or "Invalid" in msg or "must be" in msg or "not connected" in msg or "missing" in msg:
-                                overall_type = "error"
-                                break
-                        flash(" | ".join(automation_messages), overall_type)
+                    if automation_results:
+                        overall_type = "success" if all(ok for ok, _ in automation_results) else "error"
+                        flash(" | ".join(message for _, message in automation_results), overall_type)
                 elif analysis_result and analysis_result.get('error'):
                     flash(f"AI Analysis Error: {analysis_result['error']}", "error")
-
-            trello_client = get_trello_client(current_user)
-            boards = trello_client.list_boards() if trello_client else []
             
         except Exception as e:
             flash(f"An error occurred while processing your request: {str(e)}", "error")
-            trello_client = get_trello_client(current_user)
-            boards = trello_client.list_boards() if trello_client else []
             analysis_result = None
             
-        return render_template('index.html', analysis=analysis_result, transcript=transcript_text, trello_boards=boards)
+        # Single boards lookup for every outcome, served from the per-user
+        # cache (and the request's memoized client) in the common case
+        return render_template('index.html', analysis=analysis_result, transcript=transcript_text,
+                               trello_boards=get_trello_boards(current_user))
 
     # --- USERNAME AVAILABILITY CHECK ---
     @app.route('/check_username', methods=['POST', 'OPTIONS'])
@@ -511,7 +747,7 @@ def create_app():
                 return jsonify({'available': False, 'message': 'Username must be less than 20 characters'}), 200
             
             # Check if username exists
-            existing_user = User.objects(username=username).first()
+            existing_user = User.objects(username=username).only('id').as_pymongo().first()
             if existing_user:
                 return jsonify({'available': False, 'message': 'Username is already taken'}), 200
             
@@ -576,9 +812,11 @@ def create_app():
                     flash(message, 'error')
                     return redirect(url_for('register'))
                 
+                password_hash = _hash_executor.submit(User.hash_password, password)
+
                 # Check if username or email already exists
-                existing_username = User.objects(username=username).first()
-                existing_email = User.objects(email=email).first()
+                existing_username = User.objects(username=username).only('id').as_pymongo().first()
+                existing_email = email_registered(email)
                 
                 if existing_username:
                     message = 'Username already exists. Please choose another.'
@@ -595,13 +833,13 @@ def create_app():
                     return redirect(url_for('register'))
                 
                 # Create new user
-                user = User(username=username, email=email)
-                user.password = password  # This will hash the password
-                user.save()
+                user = User(username=username, email=email, password_hash=password_hash.result())
+                # Saving the new token inserts the user too: one write, not two
+                otp_code = user.generate_verification_token()
                 
-                # Generate and send verification email
+                # Long-lived servers queue delivery on email_service's pool;
+                # serverless sends before responding. The verify page offers a resend
                 try:
-                    otp_code = user.generate_verification_token()
                     success, email_result = send_email_verification(email, username, otp_code)
                     if success:
                         email_message = " Verification code sent to your email."
@@ -637,7 +875,7 @@ def create_app():
                 flash('Verification code is required.', 'error')
                 return render_template('verify_email.html', email=email)
             
-            user = User.objects(email=email).first()
+            user = User.objects(email=email).only(*_VERIFICATION_FIELDS).first()
             if not user:
                 flash('User not found.', 'error')
                 return redirect(url_for('register'))
@@ -663,9 +901,12 @@ def create_app():
         
         return render_template('verify_email.html', email=email)
 
+    # Unauthenticated endpoints that hash passwords, write OTPs or send mail
+    # are limited per address (and login/OTP checks per target account too)
     @app.route('/resend_verification/<email>', methods=['POST'])
+    @limiter.limit("3 per hour")
     def resend_verification(email):
-        user = User.objects(email=email).first()
+        user = User.objects(email=email).only(*_VERIFICATION_FIELDS).first()
         if not user:
             return jsonify({'success': False, 'message': 'User not found'})
         
@@ -683,13 +924,11 @@ def create_app():
             return jsonify({'success': False, 'message': 'An error occurred'})
 
     @app.route('/login', methods=['GET', 'POST'])
+    @limiter.limit("5 per minute", methods=['POST'],
+                   key_func=lambda: request.form.get('email') or get_remote_address())
+    @limiter.limit("20 per minute", methods=['POST'])
     def login():
-        print("\n" + "="*60)
-        print("🔐 LOGIN REQUEST")
-        print("="*60)
-        
         if current_user.is_authenticated:
-            print("="*60 + "\n")
             return redirect(url_for('dashboard'))
         
         if request.method == 'POST':
@@ -697,48 +936,40 @@ def create_app():
                 email = request.form.get('email')
                 password = request.form.get('password')
                 
-                
                 if not email or not password:
-                    print("[✗] Missing email or password")
                     flash('Email and password are required.', 'error')
-                    print("="*60 + "\n")
                     return render_template('login.html')
                 
-                user = User.objects(email=email).first()
+                # Always read the current hash: a cached copy could keep a
+                # just-reset password working in other processes
+                user = User.objects(email=email) \
+                    .only('username', 'email', 'password_hash', 'is_verified', 'team_id').first()
+                password_ok = user is not None and user.verify_password(password)
+                
+                # One lazily formatted line per attempt instead of a printed banner
+                logger.debug("login attempt email=%s user_found=%s password_ok=%s verified=%s",
+                             email, user is not None, password_ok, user is not None and user.is_verified)
                 
                 if user:
-                    print(f"[✓] User found: {user.username} (ID: {user.id})")
-                    
-                    if user.verify_password(password):
-                        print(f"[✓] Password verified successfully")
-                        
+                    if password_ok:
                         # Check if email is verified
                         if not user.is_verified:
                             flash('Please verify your email before logging in. Check your email for the verification code.', 'warning')
-                            print("="*60 + "\n")
                             return redirect(url_for('verify_email', email=email))
                         
-                        print(f"[✓] Logging in user: {user.username}")
                         login_user(user, remember=True, duration=None)
                         next_page = request.args.get('next')
                         flash(f'Welcome back, {user.username}!', 'success')
-                        print(f"[✓] Login successful! Redirecting to: {next_page or 'dashboard'}")
-                        print("="*60 + "\n")
                         return redirect(next_page or url_for('dashboard'))
                     else:
-                        print(f"[✗] Password verification failed")
                         flash('Invalid email or password. Please try again.', 'error')
                 else:
-                    print(f"[✗] No user found with email: {email}")
                     flash('Invalid email or password. Please try again.', 'error')
                     
-            except Exception as e:
-                print(f"[✗] Error in login: {type(e).__name__}: {str(e)}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                logger.exception("Error in login")
                 flash('An error occurred during login. Please try again.', 'error')
         
-        print("="*60 + "\n")
         return render_template('login.html')
 
     @app.route('/logout')
@@ -748,6 +979,7 @@ def create_app():
         return redirect(url_for('login'))
 
     @app.route('/forgot_password', methods=['GET', 'POST'])
+    @limiter.limit("3 per hour", methods=['POST'])
     def forgot_password():
         if request.method == 'POST':
             email = request.form.get('email')
@@ -755,7 +987,7 @@ def create_app():
                 flash('Email is required.', 'error')
                 return render_template('forgot_password.html')
             
-            user = User.objects(email=email).first()
+            user = User.objects(email=email).only(*_RESET_FIELDS).first()
             if user:
                 # Generate OTP
                 otp = user.generate_reset_token()
@@ -770,6 +1002,8 @@ def create_app():
         return render_template('forgot_password.html')
 
     @app.route('/verify_reset_code/<email>', methods=['GET', 'POST'])
+    @limiter.limit("10 per 15 minutes", methods=['POST'],
+                   key_func=lambda: request.view_args['email'])
     def verify_reset_code(email):
         if request.method == 'POST':
             # Check if this is step 1 (code verification) or step 2 (password change)
@@ -781,7 +1015,7 @@ def create_app():
                     flash('Verification code is required.', 'error')
                     return render_template('verify_reset_code.html', email=email, step='verify')
                 
-                user = User.objects(email=email).first()
+                user = User.objects(email=email).only('reset_token', 'reset_token_expires').first()
                 if user and user.verify_reset_token(otp):
                     # Code is valid, show password change form
                     flash('Code verified successfully! Now enter your new password.', 'success')
@@ -805,11 +1039,10 @@ def create_app():
                     return render_template('verify_reset_code.html', email=email, step='change_password', verified_code=otp)
                 
                 # Verify the code again for security
-                user = User.objects(email=email).first()
+                user = User.objects(email=email).only(*_RESET_FIELDS).first()
                 if user and user.verify_reset_token(otp):
                     # Update password
-                    user.password = new_password  # This will hash the password
-                    user.clear_reset_token()
+                    user.reset_password(new_password)
                     flash('Password updated successfully! Please log in with your new password.', 'success')
                     return redirect(url_for('login'))
                 else:
@@ -827,10 +1060,23 @@ def create_app():
         team_members = []
         
         if current_user.team_id:
-            # Get team data
-            team_data = Team.objects(id=current_user.team_id).first()
-            # Get team members
-            team_members = User.objects(team_id=current_user.team_id)
+            # Team and its members in one round trip; members are projected to
+            # what the template reads, with _id exposed as id
+            pipeline = [
+                {'$match': {'_id': ObjectId(current_user.team_id)}},
+                {'$lookup': {
+                    'from': User._get_collection_name(),
+                    'pipeline': [
+                        {'$match': {'team_id': current_user.team_id}},
+                        {'$project': {'_id': 0, 'id': '$_id', 'username': 1, 'email': 1}},
+                    ],
+                    'as': 'members',
+                }},
+                {'$project': {'name': 1, 'owner_id': 1, 'members': 1}},
+            ]
+            team_data = next(Team._get_collection().aggregate(pipeline), None)
+            if team_data:
+                team_members = team_data['members']
         
         return render_template('team.html', team=team_data, team_members=team_members)
 
@@ -849,7 +1095,7 @@ def create_app():
             new_team = Team(name=team_name, owner_id=str(current_user.id))
             new_team.save()
             current_user.team_id = str(new_team.id)
-            current_user.save()
+            User.objects(pk=current_user.pk).update_one(set__team_id=current_user.team_id)
             flash(f'Team "{team_name}" created!', 'success')
         else:
             flash('Team name empty.', 'danger')
@@ -864,16 +1110,18 @@ def create_app():
             return redirect(url_for('team'))
         
         email = request.form.get('email')
-        user_to_invite = User.objects(email=email).first()
+        user_to_invite = User.objects(email=email).only('username', 'team_id').first()
         if user_to_invite:
             if user_to_invite.team_id:
                 flash(f'{user_to_invite.username} already in team.', 'warning')
             elif user_to_invite == current_user:
                 flash('Cannot invite self.', 'warning')
-            else:
-                user_to_invite.team_id = current_user.team_id
-                user_to_invite.save()
+            # Only claim users still without a team, in case they joined
+            # another one since the read above
+            elif User.objects(pk=user_to_invite.pk, team_id=None).update_one(set__team_id=current_user.team_id):
                 flash(f'{user_to_invite.username} added.', 'success')
+            else:
+                flash(f'{user_to_invite.username} already in team.', 'warning')
         else:
             flash('User not found.', 'danger')
         return redirect(url_for('team'))
@@ -882,13 +1130,13 @@ def create_app():
     @login_required
     def integrations():
         # Get user's integration credentials
-        trello_creds = TrelloCredentials.objects(user_id=str(current_user.id)).first()
-        jira_creds = JiraCredentials.objects(user_id=str(current_user.id)).first()
+        trello_creds = get_trello_credentials(current_user)
+        jira_creds = get_jira_credentials(current_user)
         
         # Get team data for Slack integration
         team_data = None
         if current_user.team_id:
-            team_data = Team.objects(id=current_user.team_id).first()
+            team_data = get_team(current_user.team_id, 'slack_webhook_url')
         
         return render_template('integrations.html', 
                              trello_credentials=trello_creds, 
@@ -900,12 +1148,8 @@ def create_app():
     @login_required
     def trello_connect():
         # ... (unchanged) ...
-        app_name = "AI Agent";
-        expiration = "never";
-        scope = "read,write"
-        if not TRELLO_API_KEY: flash('Trello Key missing.', 'danger'); return redirect(url_for('integrations'))
-        auth_url = f"https://trello.com/1/authorize?key={TRELLO_API_KEY}&name={app_name}&expiration={expiration}&response_type=token&scope={scope}"
-        return render_template('connect_trello.html', auth_url=auth_url)
+        if not _TRELLO_AUTH_URL: flash('Trello Key missing.', 'danger'); return redirect(url_for('integrations'))
+        return render_template('connect_trello.html', auth_url=_TRELLO_AUTH_URL)
 
     @app.route('/trello/save_token', methods=['POST'])
     @login_required
@@ -919,17 +1163,19 @@ def create_app():
             flash('Trello Key/Secret missing.', 'danger')
             return redirect(url_for('integrations'))
         try:
+            from trello import TrelloClient
             client = TrelloClient(api_key=TRELLO_API_KEY, api_secret=TRELLO_API_SECRET, token=access_token)
             trello_user = client.get_member('me')
             
             # Check if credentials already exist
-            creds = TrelloCredentials.objects(user_id=str(current_user.id)).first()
+            creds = TrelloCredentials.objects(user_id=str(current_user.id)).only('user_id').first()
             if not creds:
                 creds = TrelloCredentials(user_id=str(current_user.id))
             
             creds.token = access_token
             creds.trello_username = trello_user.full_name
             creds.save()
+            invalidate_cached(str(current_user.id), _boards_cache, _lists_cache)
             
             # Send integration success email
             send_integration_success_email(current_user.email, current_user.username, 'Trello')
@@ -944,9 +1190,10 @@ def create_app():
     @login_required
     def trello_disconnect():
         # ... (unchanged) ...
-        creds = TrelloCredentials.objects(user_id=str(current_user.id)).first()
+        creds = TrelloCredentials.objects(user_id=str(current_user.id)).only('id').first()
         if creds: 
             creds.delete()
+            invalidate_cached(str(current_user.id), _boards_cache, _lists_cache)
             flash('Trello disconnected.', 'success')
         return redirect(url_for('integrations'))
 
@@ -960,11 +1207,11 @@ def create_app():
             return redirect(url_for('integrations'))
         
         webhook_url = request.form.get('slack_webhook_url')
-        if not webhook_url or not webhook_url.startswith('https://hooks.slack.com/services/'):
+        if not webhook_url or not _SLACK_HOOK_RE.fullmatch(webhook_url):
             flash('Invalid Slack URL.', 'danger')
             return redirect(url_for('integrations'))
         
-        user_team = Team.objects(id=current_user.team_id).first()
+        user_team = Team.objects(id=current_user.team_id).only('name', 'owner_id', 'slack_webhook_url').first()
         if user_team:
             user_team.slack_webhook_url = webhook_url
             user_team.save()
@@ -982,7 +1229,7 @@ def create_app():
     def slack_disconnect():
         # ... (unchanged) ...
         if current_user.team_id:
-            user_team = Team.objects(id=current_user.team_id).first()
+            user_team = Team.objects(id=current_user.team_id).only('name', 'owner_id', 'slack_webhook_url').first()
             if user_team and user_team.slack_webhook_url:
                 user_team.slack_webhook_url = None
                 user_team.save()
@@ -1004,12 +1251,12 @@ def create_app():
             flash('All Jira fields required.', 'danger')
             return redirect(url_for('integrations'))
         
-        if not jira_url.startswith('https://') or not jira_url.endswith('.atlassian.net'):
+        if not _JIRA_URL_RE.fullmatch(jira_url):
             flash('Invalid Jira URL.', 'danger')
             return redirect(url_for('integrations'))
         
         # Check if credentials already exist
-        creds = JiraCredentials.objects(user_id=str(current_user.id)).first()
+        creds = JiraCredentials.objects(user_id=str(current_user.id)).only('user_id').first()
         if not creds:
             creds = JiraCredentials(user_id=str(current_user.id))
         
@@ -1019,6 +1266,7 @@ def create_app():
         
         try:
             creds.save()
+            invalidate_cached(str(current_user.id), _jira_projects_cache, _jira_issue_types_cache)
             # Send integration success email
             send_integration_success_email(current_user.email, current_user.username, 'Jira')
             flash('Jira connected successfully! Confirmation email sent.', 'success')
@@ -1030,10 +1278,11 @@ def create_app():
     @login_required
     def jira_disconnect():
         # ... (unchanged) ...
-        creds = JiraCredentials.objects(user_id=str(current_user.id)).first()
+        creds = JiraCredentials.objects(user_id=str(current_user.id)).only('id').first()
         if creds:
             try:
                 creds.delete()
+                invalidate_cached(str(current_user.id), _jira_projects_cache, _jira_issue_types_cache)
                 flash('Jira disconnected.', 'success')
             except Exception as e:
                 flash(f'Jira disconnect failed: {e}', 'danger')
@@ -1,9 +1,28 @@
-from mongoengine import Document, StringField, EmailField, DateTimeField, ReferenceField, IntField, BooleanField
+from mongoengine import Document, StringField, EmailField, DateTimeField, BooleanField
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-import random
-import string
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from datetime import datetime, timedelta
+from pymongo.errors import PyMongoError
+import hmac
+import logging
+import secrets
+
+logger = logging.getLogger(__name__)
+
+# Argon2id runs in C and releases the GIL while hashing, so a login doesn't
+# stall other request threads the way pure-Python PBKDF2 does
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+def _tokens_match(expected, supplied):
+    """Compare OTPs in constant time; only the (non-secret) length short-circuits"""
+    if expected is None or supplied is None:
+        return False
+    expected, supplied = str(expected).encode(), str(supplied).encode()
+    if len(expected) != len(supplied):
+        return False
+    return hmac.compare_digest(expected, supplied)
 
 class User(UserMixin, Document):
     username = StringField(required=True, unique=True, max_length=150)
@@ -24,7 +43,12 @@ class User(UserMixin, Document):
     # Collection name
     meta = {
         'collection': 'users',
-        'indexes': ['username', 'email']
+        'indexes': [
+            {'fields': ['username'], 'unique': True},
+            {'fields': ['email'], 'unique': True},
+            'team_id',
+        ],
+        'auto_create_index': False,
     }
 
     @property
@@ -33,22 +57,51 @@ class User(UserMixin, Document):
 
     @password.setter
     def password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = self.hash_password(password)
+
+    @staticmethod
+    def hash_password(password):
+        """Hash a password for storage in password_hash"""
+        return _password_hasher.hash(password)
 
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Check a password against the stored hash.
+        
+        Hashes from before the switch to Argon2 (werkzeug's pbkdf2/scrypt)
+        are still accepted, and are upgraded in place on a successful check.
+        """
+        if not self.password_hash:
+            return False
+        if self.password_hash.startswith('$argon2'):
+            try:
+                _password_hasher.verify(self.password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+            if _password_hasher.check_needs_rehash(self.password_hash):
+                self._store_password_hash(password)
+            return True
+        if check_password_hash(self.password_hash, password):
+            self._store_password_hash(password)
+            return True
+        return False
+
+    def _store_password_hash(self, password):
+        """Rehash with the current Argon2 parameters and write just that field"""
+        self.password_hash = self.hash_password(password)
+        User.objects(pk=self.pk).update_one(set__password_hash=self.password_hash)
     
     def generate_reset_token(self):
         """Generate a 6-digit OTP for password reset"""
-        self.reset_token = ''.join(random.choices(string.digits, k=6))
-        from datetime import timedelta
+        self.reset_token = f"{secrets.randbelow(1_000_000):06d}"
         self.reset_token_expires = datetime.utcnow() + timedelta(minutes=15)  # 15 minutes expiry
-        self.save()
+        User.objects(pk=self.pk).update_one(set__reset_token=self.reset_token,
+                                            set__reset_token_expires=self.reset_token_expires)
         return self.reset_token
     
     def verify_reset_token(self, token):
         """Verify the reset token and check if it's not expired"""
-        return (self.reset_token == token and 
+        return (_tokens_match(self.reset_token, token) and 
                 self.reset_token_expires and 
                 datetime.utcnow() < self.reset_token_expires)
     
@@ -56,19 +109,31 @@ class User(UserMixin, Document):
         """Clear the reset token after successful password reset"""
         self.reset_token = None
         self.reset_token_expires = None
-        self.save()
+        User.objects(pk=self.pk).update_one(unset__reset_token=1, unset__reset_token_expires=1)
+
+    def reset_password(self, password):
+        """Set a new password and consume the reset token in one write"""
+        self.password_hash = self.hash_password(password)
+        self.reset_token = None
+        self.reset_token_expires = None
+        User.objects(pk=self.pk).update_one(set__password_hash=self.password_hash,
+                                            unset__reset_token=1, unset__reset_token_expires=1)
 
     def generate_verification_token(self):
         """Generate a 6-digit OTP for email verification"""
-        self.verification_token = ''.join(random.choices(string.digits, k=6))
-        from datetime import timedelta
+        self.verification_token = f"{secrets.randbelow(1_000_000):06d}"
         self.verification_token_expires = datetime.utcnow() + timedelta(minutes=30)  # 30 minutes expiry
-        self.save()
+        if self.pk is None:
+            # New account: the token goes out with the initial insert
+            self.save()
+        else:
+            User.objects(pk=self.pk).update_one(set__verification_token=self.verification_token,
+                                                set__verification_token_expires=self.verification_token_expires)
         return self.verification_token
     
     def verify_email_token(self, token):
         """Verify the email verification token and check if it's not expired"""
-        return (self.verification_token == token and 
+        return (_tokens_match(self.verification_token, token) and 
                 self.verification_token_expires and 
                 datetime.utcnow() < self.verification_token_expires)
     
@@ -77,7 +142,8 @@ class User(UserMixin, Document):
         self.is_verified = True
         self.verification_token = None
         self.verification_token_expires = None
-        self.save()
+        User.objects(pk=self.pk).update_one(set__is_verified=True, unset__verification_token=1,
+                                            unset__verification_token_expires=1)
 
     def get_id(self):
         """Required by Flask-Login"""
@@ -90,7 +156,9 @@ class Team(Document):
     slack_webhook_url = StringField(max_length=500)
     
     meta = {
-        'collection': 'teams'
+        'collection': 'teams',
+        'indexes': ['owner_id'],
+        'auto_create_index': False,
     }
 
 class TrelloCredentials(Document):
@@ -100,7 +168,11 @@ class TrelloCredentials(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     
     meta = {
-        'collection': 'trello_credentials'
+        'collection': 'trello_credentials',
+        'indexes': [
+            {'fields': ['user_id'], 'unique': True},
+        ],
+        'auto_create_index': False,
     }
 
 class TrelloCard(Document):
@@ -114,7 +186,11 @@ class TrelloCard(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     
     meta = {
-        'collection': 'trello_cards'
+        'collection': 'trello_cards',
+        # (user_id, board_id) also serves user_id-only queries (the worker's
+        # per-user card lookup) as a prefix
+        'indexes': [('user_id', 'board_id')],
+        'auto_create_index': False,
     }
 
 class JiraCredentials(Document):
@@ -125,5 +201,29 @@ class JiraCredentials(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     
     meta = {
-        'collection': 'jira_credentials'
+        'collection': 'jira_credentials',
+        'indexes': [
+            {'fields': ['user_id'], 'unique': True},
+        ],
+        'auto_create_index': False,
     }
+
+
+def ensure_indexes():
+    """
+    Create the indexes declared in each model's meta.
+    
+    Automatic index creation is disabled on the models so it doesn't run
+    lazily on first use in every process (or on every serverless cold
+    start). The worker calls this at startup; otherwise run it once with
+    `flask --app wsgi ensure-indexes`.
+    
+    A failed build (e.g. a unique index over data that already has
+    duplicates, or an unreachable server) is logged and skipped so the
+    caller keeps going; the index is retried on the next run.
+    """
+    for model in (User, Team, TrelloCredentials, TrelloCard, JiraCredentials):
+        try:
+            model.ensure_indexes()
+        except PyMongoError as e:
+            logger.error("Could not build indexes for %s: %s", model.__name__, e)
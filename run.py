@@ -4,7 +4,7 @@ AI Meeting Agent - MongoDB Edition
 Enhanced with email notifications and password reset
 """
 
-import os
+from config import env
 from main_app import create_app
 
 if __name__ == '__main__':
@@ -14,7 +14,7 @@ if __name__ == '__main__':
     
     # Check if all required environment variables are set
     required_vars = ['MONGO_URL', 'SENDER_EMAIL', 'SENDER_PASSWORD', 'GEMINI_API_KEY']
-    missing_vars = [var for var in required_vars if not os.environ.get(var)]
+    missing_vars = [var for var in required_vars if not env(var)]
     
     if missing_vars:
         print(f"⚠️  Warning: Missing environment variables: {', '.join(missing_vars)}")
@@ -29,6 +29,6 @@ if __name__ == '__main__':
     
     app.run(
         host='0.0.0.0',
-        port=int(os.environ.get('PORT', 5000)),
+        port=int(env('PORT', 5000)),
         debug=True
     )
@@ -1,24 +1,97 @@
-import os
 import schedule
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from trello import TrelloClient
 import mongoengine
-from mongo_models import User, TrelloCard, TrelloCredentials
-from dotenv import load_dotenv
-
-load_dotenv()
+from mongo_models import User, TrelloCard, TrelloCredentials, ensure_indexes
+from config import env
 
 # --- CONFIGURATION ---
 # Use the same Trello API Key as your main app
-TRELLO_API_KEY = os.environ.get("TRELLO_API_KEY")
-TRELLO_API_SECRET = os.environ.get("TRELLO_API_SECRET")
-MONGO_URL = os.environ.get("MONGO_URL")
+TRELLO_API_KEY = env("TRELLO_API_KEY")
+TRELLO_API_SECRET = env("TRELLO_API_SECRET")
+MONGO_URL = env("MONGO_URL")
 
 # Connect to MongoDB
 if MONGO_URL:
     mongoengine.connect(host=MONGO_URL)
 else:
     mongoengine.connect('ai_meeting_agent')
+ensure_indexes()
+
+
+# Card checks are independent HTTPS round trips to Trello, so they run
+# concurrently rather than one after another
+CARD_CHECK_WORKERS = 16
+
+# One keep-alive session shared by every Trello client for the life of the
+# process, so each sweep reuses TLS connections instead of reconnecting.
+# The pool is sized above CARD_CHECK_WORKERS so concurrent checks don't block.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+
+# user_id -> (token, TrelloClient); rebuilt when the user's token changes
+_client_cache = {}
+
+
+def get_client(creds):
+    """Return the cached TrelloClient for these credentials (a raw dict)"""
+    cached = _client_cache.get(creds['user_id'])
+    if cached and cached[0] == creds['token']:
+        return cached[1]
+    client = TrelloClient(
+        api_key=TRELLO_API_KEY,
+        api_secret=TRELLO_API_SECRET,
+        token=creds['token'],
+        http_service=_session
+    )
+    _client_cache[creds['user_id']] = (creds['token'], client)
+    return client
+
+
+# Only the fields the status line needs, with the card's list embedded
+_CARD_QUERY = {'fields': 'idList,name', 'list': 'true', 'list_fields': 'name'}
+
+
+def _check_one(client, card_record):
+    """Fetch one tracked card and describe where it is now"""
+    try:
+        # One request returns the card and the name of the list it is in, so a
+        # moved card doesn't need a second round trip just for the list name
+        card = client.fetch_json(f"cards/{card_record['card_id']}",
+                                 query_params=_CARD_QUERY)
+        if card['idList'] != card_record['list_id']:
+            return f"  -> STATUS UPDATE: Task '{card['name']}' has been moved to a new list '{card['list']['name']}'."
+        return f"  -> STATUS OK: Task '{card['name']}' is still in its original list."
+    except Exception as e:
+        # This can happen if the card was deleted in Trello
+        return f"  -> ERROR: Could not fetch card ID {card_record['card_id']}. It may have been deleted. Error: {e}"
+
+
+# Credentials of existing users joined with their tracked cards, so a sweep
+# is one server-side aggregation instead of two queries per user. user_id is
+# stored as a string, hence the conversion to match users._id.
+_TRACKED_CARDS_PIPELINE = [
+    {'$addFields': {'user_oid': {'$convert': {'input': '$user_id', 'to': 'objectId', 'onError': None}}}},
+    {'$lookup': {
+        'from': User._get_collection_name(),
+        'localField': 'user_oid',
+        'foreignField': '_id',
+        'as': 'user',
+    }},
+    {'$match': {'user': {'$ne': []}}},
+    {'$lookup': {
+        'from': TrelloCard._get_collection_name(),
+        'localField': 'user_id',
+        'foreignField': 'user_id',
+        'as': 'cards',
+    }},
+    {'$project': {'user_id': 1, 'token': 1, 'cards.card_id': 1, 'cards.list_id': 1}},
+]
 
 
 def check_trello_tasks():
@@ -29,43 +102,29 @@ def check_trello_tasks():
 
     try:
         # Find all users who have connected their Trello account
-        trello_credentials = TrelloCredentials.objects()
+        trello_credentials = list(TrelloCredentials._get_collection().aggregate(_TRACKED_CARDS_PIPELINE))
 
         if not trello_credentials:
             print("No users with Trello integrations to check.")
             return
 
-        for creds in trello_credentials:
-            user = User.objects(id=creds.user_id).first()
-            if not user:
-                continue
-                
-            client = TrelloClient(
-                api_key=TRELLO_API_KEY,
-                api_secret=TRELLO_API_SECRET,
-                token=creds.token
-            )
-
-            # Get all cards created by this user from our database
-            tracked_cards = TrelloCard.objects(user_id=creds.user_id)
-            if not tracked_cards:
-                print("  -> No tracked cards found for this user.")
-                continue
-
-            # In a real app, you would let the user define their "Done" list
-            # For now, we'll assume any card moved from its original list is progressing.
-            for card_record in tracked_cards:
-                try:
-                    card = client.get_card(card_record.card_id)
-                    if card.list_id != card_record.list_id:
-                        print(
-                            f"  -> STATUS UPDATE: Task '{card.name}' has been moved to a new list '{card.get_list().name}'.")
-                    else:
-                        print(f"  -> STATUS OK: Task '{card.name}' is still in its original list.")
-                except Exception as e:
-                    # This can happen if the card was deleted in Trello
-                    print(
-                        f"  -> ERROR: Could not fetch card ID {card_record.card_id}. It may have been deleted. Error: {e}")
+        with ThreadPoolExecutor(max_workers=CARD_CHECK_WORKERS) as executor:
+            for creds in trello_credentials:
+                client = get_client(creds)
+
+                # Get all cards created by this user from our database
+                tracked_cards = creds['cards']
+                if not tracked_cards:
+                    print("  -> No tracked cards found for this user.")
+                    continue
+
+                # In a real app, you would let the user define their "Done" list
+                # For now, we'll assume any card moved from its original list is progressing.
+                futures = [executor.submit(_check_one, client, card_record) for card_record in tracked_cards]
+                for future in as_completed(futures):
+                    print(future.result())
+    except Exception as e:
+        print(f"--- Accountability check failed: {e} ---")
 
 
 if __name__ == "__main__":
@@ -76,6 +135,11 @@ if __name__ == "__main__":
     print("--- AI Accountability Worker Started ---")
     print("Waiting for scheduled job...")
 
+    # Sleep until the next job is due instead of polling every second
     while True:
         schedule.run_pending()
-        time.sleep(1)
+        idle = schedule.idle_seconds()
+        if idle is None:
+            break
+        if idle > 0:
+            time.sleep(idle)
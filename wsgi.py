@@ -1,23 +1,17 @@
 """
 WSGI entry point for Vercel deployment
 """
-import os
+import logging
+from config import env
 from main_app import create_app
 
-app = create_app()
+logging.basicConfig(level=env("LOG_LEVEL", "WARNING").upper())
 
-# Initialize database tables for serverless environment
-# This runs only once when the function cold starts
-with app.app_context():
-    try:
-        from extensions import db
-        # Only create tables if using SQLite (development)
-        # For production, use proper database migrations
-        if 'sqlite' in app.config.get('SQLALCHEMY_DATABASE_URI', ''):
-            db.create_all()
-    except Exception as e:
-        # Log but don't crash - database might already exist
-        print(f"[INFO] Database initialization: {e}")
+# Built once per process at import time; serverless platforms reuse the
+# module (and this app object) across warm invocations. The app runs on
+# MongoDB, so there is no schema to create here; indexes are built by the
+# worker or the `flask --app wsgi ensure-indexes` command, not per cold start.
+app = create_app()
 
 if __name__ == "__main__":
     app.run()